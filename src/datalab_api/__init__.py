@@ -1,8 +1,20 @@
+import asyncio
+import concurrent.futures
+import os
 import warnings
 from pathlib import Path
 from typing import Any, Optional, Union
 
-from ._base import BaseDatalabClient, __version__
+import httpx
+
+from ._base import (
+    BaseDatalabClient,
+    __version__,
+    _json_body,
+    _json_loads,
+    _run_sync,
+    pretty_displayer,
+)
 
 __all__ = ("__version__", "DatalabClient")
 
@@ -24,29 +36,51 @@ class DatalabClient(BaseDatalabClient):
         client.get_items()
     ```
 
+    Each method also has an async variant (e.g., `aget_item`), and using the client
+    as an async context manager keeps a single async HTTP session open for these, e.g.,
+
+    ```python
+    async with DatalabClient("https://public.api.odbx.science") as client:
+        await asyncio.gather(*(client.aget_item(item_id) for item_id in item_ids))
+    ```
+
     """
 
-    def get_info(self) -> dict[str, Any]:
+    _supports_bulk_create: bool = True
+    """Whether the server is assumed to provide the `/new-samples/` bulk creation
+    endpoint; set to `False` the first time the endpoint is found to be missing."""
+
+    bulk_create_batch_size: int = 500
+    """The maximum number of items to send in each request when creating items in bulk."""
+
+    @pretty_displayer
+    def get_info(self, force_refresh: bool = False) -> dict[str, Any]:
         """Fetch metadata associated with this datalab instance.
 
+        The response is cached for `info_cache_ttl` seconds.
+
+        Parameters:
+            force_refresh: Whether to ignore any cached response and query the server again.
+
         Returns:
             dict: The JSON response from the `/info` endpoint of the Datalab API.
 
         """
         info_url = f"{self.datalab_api_url}/info"
-        info_resp = self.session.get(info_url, follow_redirects=True)
-        return info_resp.json()
+        return self._cached_get(info_url, force_refresh=force_refresh)
 
+    @pretty_displayer
     def authenticate(self):
         """Tests authentication of the client with the Datalab API."""
         user_url = f"{self.datalab_api_url}/get-current-user"
-        user_resp = self.session.get(user_url, follow_redirects=True)
+        user_resp = self.session.get(user_url)
         if user_resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to authenticate to {self.datalab_api_url!r}: {user_resp.status_code=} from {self._headers}. Please check your API key."
             )
-        return user_resp.json()
+        return _json_loads(user_resp.content)
 
+    @pretty_displayer
     def get_items(self, item_type: Optional[str] = "samples") -> list[dict[str, Any]]:
         """List items of the given type available to the authenticated user.
 
@@ -61,16 +95,81 @@ class DatalabClient(BaseDatalabClient):
         if item_type is None:
             item_type = "samples"
         items_url = f"{self.datalab_api_url}/{item_type}"
-        items_resp = self.session.get(items_url, follow_redirects=True)
+        items_resp = self.session.get(items_url)
+        return self._parse_items_response(items_resp, item_type, items_url)
+
+    async def aget_items(self, item_type: Optional[str] = "samples") -> list[dict[str, Any]]:
+        """An async variant of `get_items`, which allows multiple item types to be
+        listed concurrently, e.g., with `asyncio.gather`.
+
+        Parameters:
+            item_type: The type of item to list. Defaults to "samples".
+
+        Returns:
+            A list of items of the given type.
+
+        """
+        if item_type is None:
+            item_type = "samples"
+        items_url = f"{self.datalab_api_url}/{item_type}"
+        async with self._async_session() as session:
+            items_resp = await session.get(items_url)
+        return self._parse_items_response(items_resp, item_type, items_url)
+
+    async def _apost_concurrently(
+        self,
+        url: str,
+        payloads: list[Any],
+        concurrency: int = 8,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """POSTs each of the JSON payloads to the given URL, with at most `concurrency`
+        requests in flight at once.
+
+        Parameters:
+            url: The URL to POST to.
+            payloads: The JSON payloads to send, one per request.
+            concurrency: The maximum number of requests to make at once.
+            return_exceptions: Whether to return any exceptions raised by individual
+                requests in place of their responses, rather than raising the first.
+                Only `Exception`s are returned: cancellation is always propagated.
+
+        Returns:
+            The responses, in the same order as `payloads`.
+
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _post(
+            session: httpx.AsyncClient, payload: Any
+        ) -> Union[httpx.Response, Exception]:
+            # catch `Exception` rather than use `gather(return_exceptions=True)`, so that
+            # e.g. a `CancelledError` is not returned in place of a response
+            try:
+                async with semaphore:
+                    return await session.post(url, **_json_body(payload))
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                return exc
+
+        async with self._async_session() as session:
+            return await asyncio.gather(*(_post(session, payload) for payload in payloads))
+
+    def _parse_items_response(
+        self, items_resp: httpx.Response, item_type: str, items_url: str
+    ) -> list[dict[str, Any]]:
+        """Checks and unpacks the response from an `/<item_type>` endpoint."""
         if items_resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to list items with {item_type=} at {items_url}: {items_resp.status_code=}. Check the item type is correct."
             )
-        items = items_resp.json()
+        items = _json_loads(items_resp.content)
         if items["status"] != "success":
             raise RuntimeError(f"Failed to list items at {items_url}: {items['status']!r}.")
         return items[item_type]
 
+    @pretty_displayer
     def search_items(
         self, query: str, item_types: Union[list[str], str] = ["samples", "cells"]
     ) -> list[dict[str, Any]]:
@@ -87,20 +186,49 @@ class DatalabClient(BaseDatalabClient):
         if isinstance(item_types, str):
             item_types = [item_types]
 
-        search_items_url = (
-            f"{self.datalab_api_url}/search-items?query={query}&types={','.join(item_types)}"
-        )
-        items_resp = self.session.get(search_items_url, follow_redirects=True)
+        search_items_url = f"{self.datalab_api_url}/search-items"
+        params = {"query": query, "types": ",".join(item_types)}
+        items_resp = self.session.get(search_items_url, params=params)
+        return self._parse_search_response(items_resp, item_types, search_items_url)
+
+    async def asearch_items(
+        self, query: str, item_types: Union[list[str], str] = ["samples", "cells"]
+    ) -> list[dict[str, Any]]:
+        """An async variant of `search_items`, which allows multiple searches to be
+        made concurrently, e.g., with `asyncio.gather`.
+
+        Parameters:
+            query: Free-text query to search for.
+            item_types: The types of items to search for. Defaults to ["samples", "cells"].
+
+        Returns:
+            An ordered list of items of the given types that match the query.
+
+        """
+        if isinstance(item_types, str):
+            item_types = [item_types]
+
+        search_items_url = f"{self.datalab_api_url}/search-items"
+        params = {"query": query, "types": ",".join(item_types)}
+        async with self._async_session() as session:
+            items_resp = await session.get(search_items_url, params=params)
+        return self._parse_search_response(items_resp, item_types, search_items_url)
+
+    def _parse_search_response(
+        self, items_resp: httpx.Response, item_types: list[str], search_items_url: str
+    ) -> list[dict[str, Any]]:
+        """Checks and unpacks the response from the `/search-items` endpoint."""
         if items_resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to search items with {item_types=} at {search_items_url}: {items_resp.status_code=}"
             )
-        items = items_resp.json()
+        items = _json_loads(items_resp.content)
         if items["status"] != "success":
             raise RuntimeError(f"Failed to list items at {search_items_url}: {items['status']!r}.")
 
         return items["items"]
 
+    @pretty_displayer
     def create_item(
         self, item_id: str, item_type: str, item_data: Optional[dict[str, Any]] = None
     ) -> dict[str, Any]:
@@ -112,20 +240,49 @@ class DatalabClient(BaseDatalabClient):
             item_data: The data for the item.
 
         """
-        new_item = {}
-        if item_data is not None:
-            new_item = item_data
-        new_item.update(**{"item_id": item_id, "type": item_type})
+        new_item = {**(item_data or {}), "item_id": item_id, "type": item_type}
 
         create_item_url = f"{self.datalab_api_url}/new-sample/"
         create_item_resp = self.session.post(
             create_item_url,
-            json=new_item,
-            follow_redirects=True,
+            **_json_body(new_item),
+        )
+        return self._parse_create_item_response(
+            create_item_resp, item_id, item_data, create_item_url
         )
+
+    def _parse_create_item_response(
+        self,
+        create_item_resp: httpx.Response,
+        item_id: Optional[str],
+        item_data: Optional[dict[str, Any]],
+        create_item_url: str,
+    ) -> dict[str, Any]:
+        """Checks and unpacks the response from the `/new-sample/` endpoint."""
+        try:
+            created_item = _json_loads(create_item_resp.content)
+        except Exception as exc:
+            raise exc.__class__(
+                f"Failed to create item {item_id=} with data {item_data=} at {create_item_url}: {create_item_resp.status_code=}. Check the item information is correct."
+            ) from exc
+        return self._check_created_item(
+            created_item, create_item_resp.status_code, item_id, item_data, create_item_url
+        )
+
+    def _check_created_item(
+        self,
+        created_item: dict[str, Any],
+        status_code: int,
+        item_id: Optional[str],
+        item_data: Optional[dict[str, Any]],
+        create_item_url: str,
+    ) -> dict[str, Any]:
+        """Checks the result of creating a single item, as returned by either
+        the `/new-sample/` or `/new-samples/` endpoints.
+
+        """
         try:
-            created_item = create_item_resp.json()
-            if create_item_resp.status_code == 409:
+            if status_code == 409:
                 raise DuplicateItemError(
                     f"Item {item_id=} already exists at {create_item_url}: {created_item['status']!r}."
                 )
@@ -135,9 +292,119 @@ class DatalabClient(BaseDatalabClient):
 
         except Exception as exc:
             raise exc.__class__(
-                f"Failed to create item {item_id=} with data {item_data=} at {create_item_url}: {create_item_resp.status_code=}. Check the item information is correct."
+                f"Failed to create item {item_id=} with data {item_data=} at {create_item_url}: {status_code=}. Check the item information is correct."
             ) from exc
 
+    @pretty_displayer
+    def bulk_create_items(
+        self, items: list[dict[str, Any]], concurrency: int = 16
+    ) -> list[Union[dict[str, Any], Exception]]:
+        """Create many items at once. This is the preferred way to create more
+        than a handful of items, as the items are sent to the `/new-samples/` endpoint
+        in batches of up to `bulk_create_batch_size` items per request. For older
+        servers without this endpoint, each item is created with its own request,
+        made concurrently.
+
+        Parameters:
+            items: A list of the data for each item to create, each of which
+                must include the `item_id` and `type` of the item.
+            concurrency: The maximum number of requests to make at once, if the
+                server does not support bulk creation.
+
+        Returns:
+            A list with an entry for each item in `items`, in the same order: either
+            the created item, or the exception raised when trying to create it.
+
+        """
+        return _run_sync(self.abulk_create_items(items, concurrency=concurrency))
+
+    async def abulk_create_items(
+        self, items: list[dict[str, Any]], concurrency: int = 16
+    ) -> list[Union[dict[str, Any], Exception]]:
+        """An async variant of `bulk_create_items`."""
+        results: list[Union[dict[str, Any], Exception]] = []
+
+        if self._supports_bulk_create:
+            bulk_create_url = f"{self.datalab_api_url}/new-samples/"
+            async with self._async_session() as session:
+                for start in range(0, len(items), self.bulk_create_batch_size):
+                    batch = items[start : start + self.bulk_create_batch_size]
+                    try:
+                        bulk_resp = await session.post(
+                            bulk_create_url,
+                            **_json_body({"new_sample_datas": batch}),
+                        )
+                        if bulk_resp.status_code in (404, 405):
+                            self.log.debug(
+                                "Server does not support %s, creating items one-by-one",
+                                bulk_create_url,
+                            )
+                            self._supports_bulk_create = False
+                            break
+                        results.extend(
+                            self._parse_bulk_create_response(bulk_resp, batch, bulk_create_url)
+                        )
+                    except Exception as exc:
+                        # keep the results of other batches: a failed batch fails each of its items
+                        results.extend(exc for _ in batch)
+
+        remaining = items[len(results) :]
+        if not remaining:
+            return results
+
+        create_item_url = f"{self.datalab_api_url}/new-sample/"
+        responses = await self._apost_concurrently(
+            create_item_url, remaining, concurrency=concurrency, return_exceptions=True
+        )
+        for item_data, create_item_resp in zip(remaining, responses):
+            try:
+                if isinstance(create_item_resp, Exception):
+                    raise create_item_resp
+                results.append(
+                    self._parse_create_item_response(
+                        create_item_resp, item_data.get("item_id"), item_data, create_item_url
+                    )
+                )
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def _parse_bulk_create_response(
+        self,
+        bulk_resp: httpx.Response,
+        items: list[dict[str, Any]],
+        bulk_create_url: str,
+    ) -> list[Union[dict[str, Any], Exception]]:
+        """Checks and unpacks the multi-status response from the `/new-samples/` endpoint."""
+        if bulk_resp.status_code != 207:
+            raise RuntimeError(
+                f"Failed to create items at {bulk_create_url}: {bulk_resp.status_code=}: {bulk_resp.text}."
+            )
+        bulk = _json_loads(bulk_resp.content)
+        if not len(bulk["responses"]) == len(bulk["http_codes"]) == len(items):
+            raise RuntimeError(
+                f"Failed to create items at {bulk_create_url}: expected {len(items)} results, "
+                f"got {len(bulk['responses'])} responses with {len(bulk['http_codes'])} status codes."
+            )
+        results: list[Union[dict[str, Any], Exception]] = []
+        for item_data, created_item, status_code in zip(
+            items, bulk["responses"], bulk["http_codes"]
+        ):
+            try:
+                results.append(
+                    self._check_created_item(
+                        created_item,
+                        status_code,
+                        item_data.get("item_id"),
+                        item_data,
+                        bulk_create_url,
+                    )
+                )
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    @pretty_displayer
     def update_item(self, item_id: str, item_data: dict[str, Any]) -> dict[str, Any]:
         """Update an item with the given item data.
 
@@ -153,20 +420,66 @@ class DatalabClient(BaseDatalabClient):
         update_item_url = f"{self.datalab_api_url}/save-item/"
         update_item_resp = self.session.post(
             update_item_url,
-            json=update_item_data,
-            follow_redirects=True,
+            **_json_body(update_item_data),
         )
+        return self._parse_update_item_response(update_item_resp, item_id, update_item_url)
+
+    def _parse_update_item_response(
+        self, update_item_resp: httpx.Response, item_id: str, update_item_url: str
+    ) -> dict[str, Any]:
+        """Checks and unpacks the response from the `/save-item/` endpoint."""
         if update_item_resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to update item {item_id=} at {update_item_url}: {update_item_resp.status_code=}. Check the item information is correct."
             )
-        updated_item = update_item_resp.json()
+        updated_item = _json_loads(update_item_resp.content)
         if updated_item["status"] != "success":
             raise RuntimeError(
                 f"Failed to update item at {update_item_url}: {updated_item['status']!r}."
             )
         return updated_item
 
+    @pretty_displayer
+    def bulk_update_items(
+        self, items: dict[str, dict[str, Any]], concurrency: int = 16
+    ) -> dict[str, Union[dict[str, Any], Exception]]:
+        """Update many items at once, with the requests made concurrently.
+
+        Parameters:
+            items: A dictionary of the new data for each item, keyed by item ID.
+            concurrency: The maximum number of requests to make at once.
+
+        Returns:
+            A dictionary keyed by item ID of either the updated item data, or the
+            exception raised when trying to update that item.
+
+        """
+        return _run_sync(self.abulk_update_items(items, concurrency=concurrency))
+
+    async def abulk_update_items(
+        self, items: dict[str, dict[str, Any]], concurrency: int = 16
+    ) -> dict[str, Union[dict[str, Any], Exception]]:
+        """An async variant of `bulk_update_items`."""
+        update_item_url = f"{self.datalab_api_url}/save-item/"
+        responses = await self._apost_concurrently(
+            update_item_url,
+            [{"item_id": item_id, "data": item_data} for item_id, item_data in items.items()],
+            concurrency=concurrency,
+            return_exceptions=True,
+        )
+        results: dict[str, Union[dict[str, Any], Exception]] = {}
+        for item_id, update_item_resp in zip(items, responses):
+            try:
+                if isinstance(update_item_resp, Exception):
+                    raise update_item_resp
+                results[item_id] = self._parse_update_item_response(
+                    update_item_resp, item_id, update_item_url
+                )
+            except Exception as exc:
+                results[item_id] = exc
+        return results
+
+    @pretty_displayer
     def get_item(
         self,
         item_id: Optional[str] = None,
@@ -184,7 +497,103 @@ class DatalabClient(BaseDatalabClient):
             A dictionary of item data for the item with the given ID or refcode.
 
         """
+        item_url = self._item_url(item_id, refcode)
+        item_resp = self.session.get(item_url)
+        item_data = self._parse_item_response(item_resp, item_id, refcode, item_url)
+
+        # Make concurrent calls to `/update-block` which will parse/create plots and return as JSON
+        blocks_obj = item_data["blocks_obj"]
+        if load_blocks and blocks_obj:
+            loaded_blocks = self._get_blocks(item_id=item_data["item_id"], blocks=blocks_obj)
+            blocks_obj.update(zip(blocks_obj, loaded_blocks))
 
+        return item_data
+
+    async def aget_item(
+        self,
+        item_id: Optional[str] = None,
+        refcode: Optional[str] = None,
+        load_blocks: bool = False,
+    ) -> dict[str, Any]:
+        """An async variant of `get_item`, which allows multiple items to be
+        fetched concurrently, e.g., with `asyncio.gather`.
+
+        Parameters:
+            item_id: The ID of the item to search for.
+            refcode: The refcode of the item to search for.
+            load_blocks: Whether to load the blocks associated with the item.
+
+        Returns:
+            A dictionary of item data for the item with the given ID or refcode.
+
+        """
+        async with self._async_session() as session:
+            return await self._aget_item(session, item_id, refcode, load_blocks)
+
+    async def _aget_item(
+        self,
+        session: httpx.AsyncClient,
+        item_id: Optional[str],
+        refcode: Optional[str],
+        load_blocks: bool,
+    ) -> dict[str, Any]:
+        """Gets a single item with the given async session; see `aget_item`."""
+        item_url = self._item_url(item_id, refcode)
+        item_resp = await session.get(item_url)
+        item_data = self._parse_item_response(item_resp, item_id, refcode, item_url)
+
+        blocks_obj = item_data["blocks_obj"]
+        if load_blocks and blocks_obj:
+            loaded_blocks = await self._aget_blocks(item_id=item_data["item_id"], blocks=blocks_obj)
+            blocks_obj.update(zip(blocks_obj, loaded_blocks))
+
+        return item_data
+
+    @pretty_displayer
+    def bulk_get_items(
+        self, item_ids: list[str], load_blocks: bool = False, concurrency: int = 16
+    ) -> dict[str, Union[dict[str, Any], Exception]]:
+        """Get many items at once, with the requests made concurrently. This should
+        be preferred over calling `get_item` in a loop, e.g., for each of the items
+        returned by `get_items`.
+
+        Parameters:
+            item_ids: The IDs of the items to get.
+            load_blocks: Whether to load the blocks associated with each item.
+            concurrency: The maximum number of items to request at once.
+
+        Returns:
+            A dictionary keyed by item ID of either the item data, or the exception
+            raised when trying to get that item.
+
+        """
+        return _run_sync(
+            self.abulk_get_items(item_ids, load_blocks=load_blocks, concurrency=concurrency)
+        )
+
+    async def abulk_get_items(
+        self, item_ids: list[str], load_blocks: bool = False, concurrency: int = 16
+    ) -> dict[str, Union[dict[str, Any], Exception]]:
+        """An async variant of `bulk_get_items`."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _get(
+            session: httpx.AsyncClient, item_id: str
+        ) -> Union[dict[str, Any], Exception]:
+            # catch `Exception` rather than use `return_exceptions`, so that cancellation
+            # is not returned as a result
+            try:
+                async with semaphore:
+                    return await self._aget_item(session, item_id, None, load_blocks)
+            except Exception as exc:
+                return exc
+
+        async with self._async_session() as session:
+            results = await asyncio.gather(*(_get(session, item_id) for item_id in item_ids))
+        return dict(zip(item_ids, results))
+
+    def _item_url(self, item_id: Optional[str], refcode: Optional[str]) -> str:
+        """Validates the item lookup arguments and returns the URL of the item data."""
         if item_id is None and refcode is None:
             raise ValueError("Must provide one of `item_id` or `refcode`.")
         if item_id is not None and refcode is not None:
@@ -193,56 +602,115 @@ class DatalabClient(BaseDatalabClient):
         if refcode is not None:
             raise NotImplementedError("Searching by `refcode` is not yet implemented.")
 
-        item_url = f"{self.datalab_api_url}/get-item-data/{item_id}"
-        item_resp = self.session.get(item_url, follow_redirects=True)
+        return f"{self.datalab_api_url}/get-item-data/{item_id}"
 
+    def _parse_item_response(
+        self,
+        item_resp: httpx.Response,
+        item_id: Optional[str],
+        refcode: Optional[str],
+        item_url: str,
+    ) -> dict[str, Any]:
+        """Checks and unpacks the response from the `/get-item-data/` endpoint."""
         if item_resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to find item {item_id=}, {refcode=} {item_url}: {item_resp.status_code=}. Check the item information is correct."
             )
 
-        item = item_resp.json()
+        item = _json_loads(item_resp.content)
         if item["status"] != "success":
             raise RuntimeError(f"Failed to get item at {item_url}: {item['status']!r}.")
 
-        # Filter out any deleted blocks
-        item["item_data"]["blocks_obj"] = {
-            block_id: block
-            for block_id, block in item["item_data"]["blocks_obj"].items()
-            if block_id in item["item_data"]["display_order"]
-        }
+        # Remember the attached files for later validation in `create_data_block`
+        self._cache_item_files(
+            item["item_data"]["item_id"], item["item_data"].get("file_ObjectIds", [])
+        )
 
-        # Make a call to `/update-block` which will parse/create plots and return as JSON
-        if load_blocks:
-            ret_item_id = item["item_data"]["item_id"]
-            for block_id, block in item["item_data"]["blocks_obj"].items():
-                block_data = self.get_block(
-                    item_id=ret_item_id, block_id=block_id, block_data=block
-                )
-                item["item_data"]["blocks_obj"][block_id] = block_data
+        # Filter out any deleted blocks
+        blocks_obj = item["item_data"]["blocks_obj"]
+        display_order = set(item["item_data"]["display_order"])
+        for block_id in list(blocks_obj):
+            if block_id not in display_order:
+                del blocks_obj[block_id]
 
         return item["item_data"]
 
+    def _cache_item_files(self, item_id: str, file_ids: list[str]) -> None:
+        """Remembers the files attached to an item, evicting the least recently
+        fetched items beyond `item_files_cache_size`.
+
+        """
+        self._item_files_cache[item_id] = set(file_ids)
+        self._item_files_cache.move_to_end(item_id)
+        while len(self._item_files_cache) > self.item_files_cache_size:
+            self._item_files_cache.popitem(last=False)
+
     def get_item_files(self, item_id: str) -> None:
         """Download all the files for a given item and save them locally
         in the current working directory.
 
+        Files are downloaded concurrently, see `aget_item_files`.
+
+        Parameters:
+            item_id: The ID of the item to search for.
+
+        """
+        return _run_sync(self.aget_item_files(item_id))
+
+    async def aget_item_files(self, item_id: str, concurrency: int = 8) -> None:
+        """Download all the files for a given item concurrently and save them
+        locally in the current working directory.
+
         Parameters:
             item_id: The ID of the item to search for.
+            concurrency: The maximum number of files to download at once.
 
         """
 
-        item_data = self.get_item(item_id)
-        for f in item_data.get("files", []):
-            file_location = f["location"]
-            url = file_location.replace("/app", self.datalab_api_url)
-            if Path(f["name"]).exists():
+        item_data = await self.aget_item(item_id)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _download(f: dict[str, Any]) -> None:
+            url = f["location"].replace("/app", self.datalab_api_url)
+            async with semaphore:
+                # each file is downloaded and written by a single worker thread, rather than
+                # blocking the event loop on file I/O or hopping to a thread for every chunk
+                created = await asyncio.to_thread(self._download_file, url, f["name"])
+            if not created:
                 warnings.warn(f"Will not overwrite existing file {f['name']}")
-                continue
-            with open(f["name"], "wb") as file:
-                response = self.session.get(url, follow_redirects=True)
-                file.write(response.content)
 
+        await asyncio.gather(*(_download(f) for f in item_data.get("files", [])))
+
+    def _download_file(self, url: str, path: str) -> bool:
+        """Streams the file at `url` to a new local file at `path` over the (thread-safe)
+        sync session.
+
+        Parameters:
+            url: The URL of the file to download.
+            path: The local path to save the file to.
+
+        Returns:
+            Whether the file was downloaded, i.e., `False` if a file already exists at `path`.
+
+        """
+        # create the file exclusively, so that an existing file is never truncated,
+        # even if another process creates it in the meantime or the filesystem
+        # is case-insensitive
+        try:
+            file = open(path, "xb")
+        except FileExistsError:
+            return False
+        try:
+            with file, self.session.stream("GET", url) as response:
+                for chunk in response.iter_bytes(self.download_chunk_size):
+                    file.write(chunk)
+        except BaseException:
+            # do not leave a partial download behind to block a retry
+            os.remove(path)
+            raise
+        return True
+
+    @pretty_displayer
     def get_block(self, item_id: str, block_id: str, block_data: dict[str, Any]) -> dict[str, Any]:
         """Get a block with a given ID and block data.
         Should be used in conjunction with `get_item` to load an existing block.
@@ -263,17 +731,117 @@ class DatalabClient(BaseDatalabClient):
             "block_id": block_id,
             "save_to_db": False,
         }
-        block_resp = self.session.post(block_url, json=block_request, follow_redirects=True)
+        block_resp = self.session.post(block_url, **_json_body(block_request))
+        return self._parse_block_response(block_resp, item_id, block_id, block_url)
+
+    async def aget_block(
+        self, item_id: str, block_id: str, block_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """An async variant of `get_block`.
+
+        Parameters:
+            item_id: The ID of the item to search for.
+            block_id: The ID of the block to search for.
+            block_data: Any other block data required by the request.
+
+        Returns:
+            A dictionary of block data for the block with the given ID.
+
+        """
+        block_url = f"{self.datalab_api_url}/update-block/"
+        block_request = {
+            "block_data": block_data,
+            "item_id": item_id,
+            "block_id": block_id,
+            "save_to_db": False,
+        }
+        async with self._async_session() as session:
+            block_resp = await session.post(block_url, **_json_body(block_request))
+        return self._parse_block_response(block_resp, item_id, block_id, block_url)
+
+    def _get_blocks(
+        self, item_id: str, blocks: dict[str, dict[str, Any]], concurrency: int = 8
+    ) -> list[dict[str, Any]]:
+        """Loads the given blocks of an item concurrently via the `/update-block/` endpoint,
+        from a pool of threads sharing the long-lived sync session (and so its connections),
+        rather than starting an event loop with a new async client.
+
+        Parameters:
+            item_id: The ID of the item that the blocks belong to.
+            blocks: A dictionary of block data keyed by block ID.
+            concurrency: The maximum number of blocks to request at once.
+
+        Returns:
+            A list of the loaded block data, in the same order as `blocks`.
+
+        """
+        block_url = f"{self.datalab_api_url}/update-block/"
+        session = self.session
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(concurrency, len(blocks))
+        ) as executor:
+            block_resps = list(
+                executor.map(
+                    lambda block_request: session.post(block_url, **_json_body(block_request)),
+                    self._block_requests(item_id, blocks),
+                )
+            )
+        return [
+            self._parse_block_response(block_resp, item_id, block_id, block_url)
+            for block_id, block_resp in zip(blocks, block_resps)
+        ]
+
+    async def _aget_blocks(
+        self, item_id: str, blocks: dict[str, dict[str, Any]], concurrency: int = 8
+    ) -> list[dict[str, Any]]:
+        """Loads the given blocks of an item concurrently via the `/update-block/` endpoint.
+
+        Parameters:
+            item_id: The ID of the item that the blocks belong to.
+            blocks: A dictionary of block data keyed by block ID.
+            concurrency: The maximum number of blocks to request at once.
+
+        Returns:
+            A list of the loaded block data, in the same order as `blocks`.
+
+        """
+        block_url = f"{self.datalab_api_url}/update-block/"
+        block_resps = await self._apost_concurrently(
+            block_url, self._block_requests(item_id, blocks), concurrency=concurrency
+        )
+        return [
+            self._parse_block_response(block_resp, item_id, block_id, block_url)
+            for block_id, block_resp in zip(blocks, block_resps)
+        ]
+
+    @staticmethod
+    def _block_requests(item_id: str, blocks: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+        """Builds the `/update-block/` request payloads to load each of the given blocks."""
+        return [
+            {
+                "block_data": block_data,
+                "item_id": item_id,
+                "block_id": block_id,
+                "save_to_db": False,
+            }
+            for block_id, block_data in blocks.items()
+        ]
+
+    def _parse_block_response(
+        self, block_resp: httpx.Response, item_id: str, block_id: str, block_url: str
+    ) -> dict[str, Any]:
+        """Checks and unpacks the response from the `/update-block/` endpoint."""
         if block_resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to find block {block_id=} for item {item_id=} at {block_url}: {block_resp.status_code=}. Check the block information is correct."
             )
 
-        block = block_resp.json()
+        block = _json_loads(block_resp.content)
         if block["status"] != "success":
             raise RuntimeError(f"Failed to get block at {block_url}: {block['status']!r}.")
         return block["new_block_data"]
 
+    @pretty_displayer
     def upload_file(self, item_id: str, file_path: Union[Path, str]) -> dict[str, Any]:
         """Upload a file to an item with a given ID.
 
@@ -285,31 +853,35 @@ class DatalabClient(BaseDatalabClient):
             A dictionary of the uploaded file data.
 
         """
-        if isinstance(file_path, str):
-            file_path = Path(file_path)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File {file_path=} does not exist.")
+        file_path = os.fspath(file_path)
 
         upload_url = f"{self.datalab_api_url}/upload-file/"
-        with open(file_path, "rb") as file:
-            files = {"file": (file_path.name, file)}
+        try:
+            file = open(file_path, "rb")
+        except FileNotFoundError as exc:
+            raise FileNotFoundError(f"File {file_path=} does not exist.") from exc
+        with file:
+            files = {"file": (os.path.basename(file_path), file)}
             upload_resp = self.session.post(
                 upload_url,
                 files=files,
                 data={"item_id": item_id, "replace_file": None},
-                follow_redirects=True,
             )
         if upload_resp.status_code != 201:
             raise RuntimeError(
                 f"Failed to upload file {file_path=} to item {item_id=} at {upload_url}: {upload_resp.status_code=}. Check the file information is correct."
             )
 
-        upload = upload_resp.json()
+        # The set of attached files has changed, so force a re-fetch in `create_data_block`
+        self._item_files_cache.pop(item_id, None)
+
+        upload = _json_loads(upload_resp.content)
         if upload["status"] != "success":
             raise RuntimeError(f"Failed to upload file at {upload_url}: {upload['status']!r}.")
 
         return upload
 
+    @pretty_displayer
     def create_data_block(
         self,
         item_id: str,
@@ -349,20 +921,25 @@ class DatalabClient(BaseDatalabClient):
         if file_ids:
             if isinstance(file_ids, str):
                 file_ids = [file_ids]
-            # check that the file is attached to the item
-            item = self.get_item(item_id=item_id, load_blocks=False)
-            attached_file_ids = set(item["file_ObjectIds"])
-            if not set(file_ids).issubset(attached_file_ids):
+            # check that the file is attached to the item, reusing the attached files
+            # from any previous `get_item` call; files may also have been attached
+            # elsewhere since (e.g., in the UI), so re-fetch the item before giving up
+            attached_file_ids = self._item_files_cache.get(item_id, set())
+            if not attached_file_ids.issuperset(file_ids):
+                item = self.get_item(item_id=item_id, load_blocks=False)
+                attached_file_ids = set(item.get("file_ObjectIds", []))
+            missing = [file_id for file_id in file_ids if file_id not in attached_file_ids]
+            if missing:
                 raise RuntimeError(
-                    f"Not all IDs {file_ids=} are attached to item {item_id=}: {attached_file_ids=}"
+                    f"Not all IDs {file_ids=} are attached to item {item_id=}: {missing=}, {attached_file_ids=}"
                 )
 
-        block_resp = self.session.post(blocks_url, json=payload, follow_redirects=True)
+        block_resp = self.session.post(blocks_url, **_json_body(payload))
         if block_resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to create block {block_type=} for item {item_id=}:\n{block_resp.text}"
             )
-        block_data = block_resp.json()["new_block_obj"]
+        block_data = _json_loads(block_resp.content)["new_block_obj"]
 
         if file_ids:
             block_data = self._update_data_block(
@@ -393,8 +970,8 @@ class DatalabClient(BaseDatalabClient):
             "save_to_db": True,
         }
 
-        resp = self.session.post(blocks_url, json=payload, follow_redirects=True)
+        resp = self.session.post(blocks_url, **_json_body(payload))
         if resp.status_code != 200:
             raise RuntimeError(f"Failed to update block {block_type=}:\n{resp.text}")
 
-        return resp.json()["new_block_data"]
+        return _json_loads(resp.content)["new_block_data"]
@@ -1,22 +1,189 @@
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import copy
 import functools
+import hashlib
+import ipaddress
+import json
 import logging
 import os
+import random
 import re
+import ssl
+import time
+import urllib.request
 import warnings
 from importlib.metadata import version
-from typing import Any, Optional
+from pathlib import Path
+from typing import Any, AsyncIterator, ClassVar, Optional
 
 import httpx
-from rich.console import Console
-from rich.logging import RichHandler
-from rich.pretty import pprint
-from rich.table import Table
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 __version__ = version("datalab-api")
 
 __all__ = ("__version__", "BaseDatalabClient")
 
 
+def _json_loads(content: bytes) -> Any:
+    """Decodes a JSON response body, using `orjson` if it is installed.
+
+    `orjson` rejects the non-standard `NaN` and `Infinity` values that the stdlib
+    `json` module (and hence the datalab server) emits, so such content is
+    decoded with `json` instead, giving the same result with either backend.
+
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content)
+
+
+def _json_dumps(payload: Any) -> bytes:
+    """Serializes `payload` to JSON bytes.
+
+    Always uses the stdlib `json` module: `orjson` silently writes `NaN` and
+    `Infinity` as `null` and cannot encode integers beyond 64 bits, which would
+    corrupt scientific data, and request bodies are small enough that encoding
+    them is not a bottleneck.
+
+    """
+    return json.dumps(payload).encode("utf-8")
+
+
+def _json_body(payload: Any) -> dict[str, Any]:
+    """Returns the `httpx` request arguments for sending `payload` as a JSON body."""
+    return {"content": _json_dumps(payload), "headers": {"Content-Type": "application/json"}}
+
+
+def _default_cache_dir() -> Path:
+    """Returns the directory used to persist cached responses between clients."""
+    return Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "datalab-api"
+
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context() -> ssl.SSLContext:
+    """Returns the SSL context shared by all HTTP clients in this process, as creating one
+    (and loading the CA bundle into it) is relatively expensive.
+
+    """
+    return httpx.create_ssl_context()
+
+
+def _environment_proxies() -> dict[str, Optional[str]]:
+    """Returns the proxies configured in the environment (e.g., `HTTPS_PROXY` and `NO_PROXY`),
+    as `httpx` mount patterns mapped to proxy URLs (or `None` for hosts that bypass the proxy).
+
+    `httpx` ignores the environment when a custom transport is given, so the clients
+    below mount a retrying transport for each proxy themselves. The environment is
+    interpreted with the same rules as `httpx` uses for its default transport (and
+    thus for the handshake in `_detect_api_url`), following curl's handling of `NO_PROXY`.
+
+    """
+    proxies = urllib.request.getproxies()
+    mounts: dict[str, Optional[str]] = {}
+    for scheme in ("http", "https", "all"):
+        if proxies.get(scheme):
+            proxy = proxies[scheme]
+            mounts[f"{scheme}://"] = proxy if "://" in proxy else f"http://{proxy}"
+
+    for host in (host.strip() for host in proxies.get("no", "").split(",")):
+        if host == "*":
+            # bypass the proxies for all hosts
+            return {}
+        if not host:
+            continue
+        if "://" in host:
+            mounts[host] = None
+        elif host.lower() == "localhost" or _is_ip_address(host, ipaddress.IPv4Address):
+            mounts[f"all://{host}"] = None
+        elif _is_ip_address(host, ipaddress.IPv6Address):
+            mounts[f"all://[{host}]"] = None
+        else:
+            # e.g., `example.com` bypasses the proxies for `example.com` and `www.example.com`
+            mounts[f"all://*{host}"] = None
+    return mounts
+
+
+def _is_ip_address(host: str, address_type: type) -> bool:
+    """Whether `host` (optionally with a CIDR suffix) is an IP address of the given type."""
+    try:
+        address_type(host.split("/")[0])
+    except ValueError:
+        return False
+    return True
+
+
+_API_URL_META_RE = re.compile(rb'<meta name="x_datalab_api_url" content="(.*?)">', re.IGNORECASE)
+"""Matches the meta tag in the HTML of a datalab UI that points to its API URL."""
+
+_MAX_HANDSHAKE_BYTES = 256 * 1024
+"""The maximum number of bytes to read from the given URL when looking for the API URL meta tag."""
+
+logging.getLogger(__package__).addHandler(logging.NullHandler())
+_rich_handler: Optional[logging.Handler] = None
+
+
+def _configure_logging(log_level: Optional[str]) -> None:
+    """Sets the level of the package logger, without touching the root logger.
+
+    The package logger is shared by all clients in the process, so its level is
+    only changed when a level is requested explicitly; otherwise, a client created
+    later would reset the level chosen for an earlier one.
+
+    If a more verbose level than "WARNING" is requested and the application has
+    not configured logging itself, a rich handler is attached (once) so that
+    the messages are shown.
+
+    """
+    global _rich_handler
+    logger = logging.getLogger(__package__)
+    if log_level is not None:
+        logger.setLevel(log_level)
+    if (
+        _rich_handler is None
+        and logger.getEffectiveLevel() < logging.WARNING
+        and not logging.getLogger().handlers
+    ):
+        from rich.logging import RichHandler
+
+        _rich_handler = RichHandler()
+        logger.addHandler(_rich_handler)
+
+
+def _parse_version(version: str) -> tuple[int, ...]:
+    """Parses a version string (e.g., `"0.10.2"`) into a tuple of integers
+    for comparison, ignoring any non-numeric suffixes.
+
+    """
+    return tuple(int(part) for part in re.findall(r"\d+", version)[:3])
+
+
+@functools.lru_cache(maxsize=None)
+def _select_api_version(
+    available_api_versions: tuple[str, ...], api_version: tuple[int, ...]
+) -> Optional[str]:
+    """Returns the latest of the available API versions that matches the major and minor
+    versions of `api_version`, if any. Cached, as each client for the same instance will
+    negotiate the same version.
+
+    """
+    for parsed, available_api_version in sorted(
+        ((_parse_version(v), v) for v in available_api_versions), reverse=True
+    ):
+        if parsed[:2] == api_version[:2]:
+            return available_api_version
+    return None
+
+
 def pretty_displayer(method):
     """A decorator which wraps a method with a 'display' kwarg, which will
     either pretty print a JSON response, or display a Rich table.
@@ -25,10 +192,18 @@ def pretty_displayer(method):
 
     @functools.wraps(method)
     def rich_wrapper(self, *args, **kwargs):
+        if not kwargs:
+            return method(self, *args)
         display = kwargs.pop("display", False)
         page_limit = kwargs.pop("page_limit", 10)
         result = method(self, *args, **kwargs)
         if display:
+            # rich is only needed for interactive display, so is imported lazily
+            from rich.console import Console
+            from rich.pretty import pprint
+            from rich.table import Table
+            from rich.text import Text
+
             blocks = None
             if isinstance(result, dict):
                 if "blocks_obj" in result:
@@ -38,7 +213,8 @@ def pretty_displayer(method):
                     result = None
                 if blocks:
                     for block in blocks.values():
-                        if "bokeh_plot_data" in block:
+                        # skip blocks without a plot, so that bokeh is only imported when needed
+                        if block.get("bokeh_plot_data"):
                             bokeh_from_json(block)
                 if result:
                     pprint(result, max_length=None, max_string=100, max_depth=3)
@@ -48,7 +224,12 @@ def pretty_displayer(method):
                 table.add_column("ID", style="cyan", no_wrap=True)
                 table.add_column("refcode", style="magenta", no_wrap=True)
                 table.add_column("name", width=30, overflow="ellipsis", no_wrap=True)
+                errors = []
                 for item in result[:page_limit]:
+                    # bulk methods return the exception for any item that failed
+                    if isinstance(item, Exception):
+                        errors.append(item)
+                        continue
                     table.add_row(
                         item["type"][0].upper(),
                         item["item_id"],
@@ -58,18 +239,157 @@ def pretty_displayer(method):
                     )
                 console = Console()
                 console.print(table)
+                for error in errors:
+                    console.print(Text(f"{type(error).__name__}: {error}", style="red"))
 
         return result
 
     return rich_wrapper
 
 
-class AutoPrettyPrint(type):
-    def __new__(cls, name, bases, dct):
-        for attr, value in dct.items():
-            if callable(value) and not attr.startswith("__"):
-                dct[attr] = pretty_displayer(value)
-        return super().__new__(cls, name, bases, dct)
+class _RetryPolicy:
+    """Shared retry and circuit-breaker logic for the retrying transports below.
+
+    Requests that fail to connect are retried with exponential backoff, as
+    they never reached the server. Idempotent requests are also retried after
+    a gateway error; non-idempotent requests (e.g., creating an item) are not,
+    as the server may have acted on them. Read timeouts are not retried, so
+    that a hung server costs a single read timeout rather than one per attempt.
+    After `failure_threshold` consecutive failed requests, all requests fail
+    immediately for `reset_timeout` seconds, rather than each waiting out its
+    own timeouts against a dead server.
+
+    This is the only layer of retries: the wrapped transports must not retry
+    connections themselves, or the attempts would multiply.
+
+    """
+
+    retry_methods = frozenset({"GET", "HEAD", "OPTIONS"})
+    retry_exceptions = (httpx.ConnectError, httpx.ConnectTimeout)
+    retry_status_codes = frozenset({502, 503, 504})
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: float = 0.25,
+        max_backoff: float = 4.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    def check_circuit(self, request: httpx.Request) -> None:
+        if self._open_until > time.monotonic():
+            raise httpx.ConnectError(
+                f"Not sending request to {request.url.host}: {self._consecutive_failures} consecutive requests "
+                f"have failed, retrying in {self._open_until - time.monotonic():.0f} s.",
+                request=request,
+            )
+
+    def attempts(self) -> int:
+        return self.max_retries + 1
+
+    def retry_response(self, request: httpx.Request, response: httpx.Response) -> bool:
+        return (
+            request.method in self.retry_methods and response.status_code in self.retry_status_codes
+        )
+
+    def delay(self, attempt: int) -> float:
+        # "equal jitter": wait at least half of the backoff, so that many clients
+        # failing at once do not all retry in lockstep
+        delay = min(self.backoff * 2**attempt, self.max_backoff)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def record(self, failed: bool) -> None:
+        if not failed:
+            self._consecutive_failures = 0
+            return
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            self._open_until = time.monotonic() + self.reset_timeout
+
+
+class _RetryTransport(httpx.BaseTransport):
+    """Wraps a transport to retry requests according to a `_RetryPolicy`."""
+
+    def __init__(self, transport: httpx.BaseTransport, policy: _RetryPolicy):
+        self._transport = transport
+        self._policy = policy
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._policy.check_circuit(request)
+        attempts = self._policy.attempts()
+        for attempt in range(attempts):
+            try:
+                response = self._transport.handle_request(request)
+            except self._policy.retry_exceptions:
+                if attempt == attempts - 1:
+                    self._policy.record(failed=True)
+                    raise
+            else:
+                if not self._policy.retry_response(request, response) or attempt == attempts - 1:
+                    self._policy.record(
+                        failed=response.status_code in self._policy.retry_status_codes
+                    )
+                    return response
+                response.close()
+            time.sleep(self._policy.delay(attempt))
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Wraps an async transport to retry requests according to a `_RetryPolicy`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: _RetryPolicy):
+        self._transport = transport
+        self._policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._policy.check_circuit(request)
+        attempts = self._policy.attempts()
+        for attempt in range(attempts):
+            try:
+                response = await self._transport.handle_async_request(request)
+            except self._policy.retry_exceptions:
+                if attempt == attempts - 1:
+                    self._policy.record(failed=True)
+                    raise
+            else:
+                if not self._policy.retry_response(request, response) or attempt == attempts - 1:
+                    self._policy.record(
+                        failed=response.status_code in self._policy.retry_status_codes
+                    )
+                    return response
+                await response.aclose()
+            await asyncio.sleep(self._policy.delay(attempt))
+        raise AssertionError("unreachable")
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _run_sync(coro):
+    """Runs a coroutine to completion from synchronous code.
+
+    If an event loop is already running in this thread (e.g., inside a Jupyter
+    notebook), the coroutine is run in a fresh event loop on a worker thread instead.
+
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
 
 
 def bokeh_from_json(block_data, show=True):
@@ -80,14 +400,15 @@ def bokeh_from_json(block_data, show=True):
         bokeh_plot_data = block_data["bokeh_plot_data"]
     else:
         bokeh_plot_data = block_data
-    curdoc().replace_with_json(bokeh_plot_data["doc"])
+    doc = curdoc()
+    doc.replace_with_json(bokeh_plot_data["doc"])
     if show:
-        bokeh_show(curdoc().roots[0])
+        bokeh_show(doc.roots[0])
 
-    return curdoc()
+    return doc
 
 
-class BaseDatalabClient(metaclass=AutoPrettyPrint):
+class BaseDatalabClient:
     """A base class that implements some of the shared/logistical functionality
     (hopefully) common to all Datalab clients.
 
@@ -97,7 +418,15 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
 
     _api_key: Optional[str] = None
     _session: Optional[httpx.Client] = None
-    _headers: dict[str, str] = {}
+    _async_client: Optional[httpx.AsyncClient] = None
+    _async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+    _info_cache: ClassVar[dict[str, tuple[float, Any]]] = {}
+    """Responses from instance metadata endpoints, keyed by URL and shared by all clients
+    in this process, so that creating several clients for the same instance only fetches
+    `/info` once."""
+
+    api_version: tuple[int, int, int] = (0, 1, 0)
+    """The version of the Datalab API that this client is written against."""
 
     bad_server_versions: Optional[tuple[tuple[int, int, int]]] = ((0, 2, 0),)
     """Any known server versions that are not supported by this client."""
@@ -105,7 +434,42 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
     min_server_version: tuple[int, int, int] = (0, 1, 0)
     """The minimum supported server version that this client supports."""
 
-    def __init__(self, datalab_api_url: str, log_level: str = "WARNING"):
+    download_chunk_size: int = 256 * 1024
+    """The size (in bytes) of the chunks to read from the network when streaming file downloads."""
+
+    _timeout: httpx.Timeout = httpx.Timeout(30.0, connect=5.0)
+    """The timeouts for requests made by the HTTP clients: connections should be
+    established quickly, but some endpoints (e.g., block parsing) can take a while to respond."""
+
+    _limits: httpx.Limits = httpx.Limits(
+        max_keepalive_connections=64, max_connections=128, keepalive_expiry=60.0
+    )
+    """The connection pool limits for the HTTP clients, sized so that concurrent
+    requests (e.g., file downloads) are not throttled by the pool, and idle connections
+    are kept warm between calls."""
+
+    max_retries: int = 3
+    """The number of times to retry requests that fail transiently (i.e., that fail to connect,
+    or idempotent requests that get a 502/503/504 response), with exponential backoff."""
+
+    retry_backoff: float = 0.25
+    """The delay (in seconds) before the first retry of a failed request, doubling for each retry
+    (with random jitter)."""
+
+    item_files_cache_size: int = 128
+    """The number of items for which to remember the attached file IDs (from e.g. `get_item`),
+    to avoid re-fetching the item when creating data blocks for it."""
+
+    info_cache_ttl: float = 300.0
+    """The time (in seconds) for which responses from instance metadata endpoints (e.g., `/info`) are cached."""
+
+    def __init__(
+        self,
+        datalab_api_url: str,
+        log_level: Optional[str] = None,
+        cache: bool = False,
+        max_retries: Optional[int] = None,
+    ):
         """Creates an authenticated client.
 
         An API key is required to authenticate requests. The client will attempt to load it from a
@@ -118,8 +482,15 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
                 TODO: If the URL of a datalab *UI* is provided, a request will be made to attempt
                 to resolve the underlying API URL (e.g., `https://public.datalab.odbx.science`
                 will 'redirect' to `https://public.api.odbx.science`).
-            log_level: The logging level to use for the client. Defaults to "WARNING".
-
+            log_level: The logging level to set for the `datalab_api` logger, which is shared
+                by all clients in the process. If not provided, the current level is kept
+                (by default, only warnings and errors are shown).
+            cache: Whether to also persist responses from instance metadata endpoints
+                (e.g., `/info`) to disk, so that they can be reused by other clients
+                (e.g., repeated runs of the same script) for `info_cache_ttl` seconds.
+            max_retries: The number of times to retry requests that fail transiently,
+                if different from the class default `max_retries`; e.g., `0` for interactive use
+                where failing fast is preferred, or a larger value for unattended bulk scripts.
 
         """
 
@@ -128,11 +499,17 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
             raise ValueError("No Datalab API URL provided.")
         if not self.datalab_api_url.startswith("http"):
             self.datalab_api_url = f"https://{self.datalab_api_url}"
-        logging.basicConfig(level=log_level, handlers=[RichHandler()])
+        _configure_logging(log_level)
         self.log = logging.getLogger(__name__)
 
-        self._http_client = httpx.Client
-        self._headers["User-Agent"] = f"Datalab Python API/{__version__}"
+        self._cache_dir: Optional[Path] = _default_cache_dir() if cache else None
+        self._item_files_cache: collections.OrderedDict[str, set[str]] = collections.OrderedDict()
+        self._headers: dict[str, str] = {"User-Agent": f"Datalab Python API/{__version__}"}
+        if max_retries is not None:
+            if max_retries < 0:
+                raise ValueError(f"{max_retries=} must be non-negative.")
+            self.max_retries = max_retries
+        self._retry_policy = _RetryPolicy(max_retries=self.max_retries, backoff=self.retry_backoff)
 
         self._detect_api_url()
 
@@ -157,14 +534,19 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
         Do not use the session for this, so we are not passing the API key to arbitrary URLs.
 
         """
-        response = httpx.get(self.datalab_api_url)
-        match = re.search(
-            r'<meta name="x_datalab_api_url" content="(.*?)">',
-            response.text,
-            re.IGNORECASE,
-        )
+        # the meta tag is in the page `<head>`, so only read as much of the response as needed
+        content = bytearray()
+        match = None
+        with httpx.stream(
+            "GET", self.datalab_api_url, verify=_ssl_context(), timeout=self._timeout
+        ) as response:
+            for chunk in response.iter_bytes():
+                content += chunk
+                match = _API_URL_META_RE.search(content)
+                if match or len(content) >= _MAX_HANDSHAKE_BYTES:
+                    break
         if match:
-            self.datalab_api_url = match.group(1)
+            self.datalab_api_url = match.group(1).decode("utf-8")
             warnings.warn(
                 f"Found API URL {self.datalab_api_url} in HTML meta tag. Creating client with this URL instead."
             )
@@ -172,12 +554,137 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
     def get_info(self) -> dict[str, Any]:
         raise NotImplementedError
 
+    @classmethod
+    def clear_info_cache(cls) -> None:
+        """Clear the in-memory cache of instance metadata shared between clients,
+        so that the next request to e.g. `/info` is made to the server.
+
+        """
+        cls._info_cache.clear()
+
+    def _cached_get(self, url: str, force_refresh: bool = False) -> Any:
+        """Makes a GET request to the given URL and returns the decoded JSON response,
+        reusing any successful response to the same URL from the last `info_cache_ttl`
+        seconds.
+
+        Should only be used for endpoints that change rarely, e.g., instance metadata.
+
+        Parameters:
+            url: The URL to request.
+            force_refresh: Whether to ignore any cached response.
+
+        """
+        now = time.time()
+        if not force_refresh:
+            cached = self._info_cache.get(url)
+            if cached is None and self._cache_dir is not None:
+                cached = self._read_disk_cache(url)
+            if cached is not None and now - cached[0] < self.info_cache_ttl:
+                # the cache is shared between clients, so do not hand out the cached object itself
+                return copy.deepcopy(cached[1])
+
+        response = self.session.get(url)
+        data = _json_loads(response.content)
+        if response.status_code == 200:
+            self._info_cache[url] = (now, copy.deepcopy(data))
+            if self._cache_dir is not None:
+                self._write_disk_cache(url, now, data)
+        return data
+
+    def _disk_cache_path(self, url: str) -> Path:
+        if self._cache_dir is None:
+            raise RuntimeError("Persistent caching is not enabled for this client.")
+        return self._cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _read_disk_cache(self, url: str) -> Optional[tuple[float, Any]]:
+        """Loads a cached response for the URL from disk, if present and readable."""
+        try:
+            cached = _json_loads(self._disk_cache_path(url).read_bytes())
+            return cached["timestamp"], cached["data"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_disk_cache(self, url: str, timestamp: float, data: Any) -> None:
+        """Persists a response for the URL to disk, ignoring any filesystem errors."""
+        path = self._disk_cache_path(url)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(_json_dumps({"url": url, "timestamp": timestamp, "data": data}))
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            self.log.debug("Failed to write cached response for %s: %s", url, exc)
+
     @property
     def session(self) -> httpx.Client:
+        """The long-lived HTTP client used for all synchronous requests, created on first use.
+
+        HTTP/2 is used where the server supports it, so that requests share a single
+        connection. Redirects are followed for all requests.
+
+        """
         if self._session is None:
-            return self._http_client(headers=self.headers)
+            self._session = httpx.Client(
+                headers=self.headers,
+                timeout=self._timeout,
+                transport=self._http_transport(),
+                mounts={
+                    pattern: self._http_transport(proxy) if proxy else None
+                    for pattern, proxy in _environment_proxies().items()
+                },
+                follow_redirects=True,
+            )
         return self._session
 
+    def _http_transport(self, proxy: Optional[str] = None) -> _RetryTransport:
+        """Creates a retrying HTTP transport for the sync session, optionally via a proxy."""
+        return _RetryTransport(
+            httpx.HTTPTransport(
+                verify=_ssl_context(), http2=True, limits=self._limits, retries=0, proxy=proxy
+            ),
+            self._retry_policy,
+        )
+
+    def _async_http_transport(self, proxy: Optional[str] = None) -> _AsyncRetryTransport:
+        """Creates a retrying HTTP transport for async sessions, optionally via a proxy."""
+        return _AsyncRetryTransport(
+            httpx.AsyncHTTPTransport(
+                verify=_ssl_context(), http2=True, limits=self._limits, retries=0, proxy=proxy
+            ),
+            self._retry_policy,
+        )
+
+    @contextlib.asynccontextmanager
+    async def _async_session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Provides an async HTTP client with the same headers as the sync session,
+        to be used as an async context manager for concurrent requests.
+
+        Within `async with client:`, the long-lived async client is reused, so that
+        connections are shared between calls; otherwise, a new client is created and
+        closed afterwards.
+
+        """
+        # an async client cannot be shared across event loops, e.g., with the worker
+        # thread used by `_run_sync` when a loop is already running
+        if self._async_client is not None and self._async_client_loop is asyncio.get_running_loop():
+            yield self._async_client
+        else:
+            async with self._new_async_session() as session:
+                yield session
+
+    def _new_async_session(self) -> httpx.AsyncClient:
+        """Creates a new async HTTP client with the same headers as the sync session."""
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self._timeout,
+            transport=self._async_http_transport(),
+            mounts={
+                pattern: self._async_http_transport(proxy) if proxy else None
+                for pattern, proxy in _environment_proxies().items()
+            },
+            follow_redirects=True,
+        )
+
     @property
     def headers(self):
         return self._headers
@@ -190,15 +697,16 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
 
         """
 
-        for available_api_version in sorted(self._datalab_api_versions):
-            major, minor, _ = (int(_) for _ in available_api_version.split("."))
-            if major == self.min_api_version[0] and minor == self.min_api_version[1]:
-                self._selected_api_version = available_api_version
-                break
-        else:
+        self._selected_api_version = _select_api_version(
+            tuple(self._datalab_api_versions), self.api_version
+        )
+        if self._selected_api_version is None:
             raise RuntimeError(f"No supported API versions found in {self._datalab_api_versions=}")
 
-        if self._datalab_server_version in self.bad_server_versions:
+        server_version = _parse_version(self._datalab_server_version)
+        if server_version < self.min_server_version or server_version in (
+            self.bad_server_versions or ()
+        ):
             raise RuntimeError(
                 f"Server version {self._datalab_server_version} is not supported by this client."
             )
@@ -232,9 +740,14 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
             if api_key is None:
                 api_key = os.getenv("DATALAB_API_KEY")
 
-            # Remove single and double quotes around API key if present
-            if api_key is not None:
-                api_key = api_key.strip("'").strip('"')
+            # Remove matching single or double quotes around API key if present
+            if (
+                api_key is not None
+                and len(api_key) >= 2
+                and api_key[0] == api_key[-1]
+                and api_key[0] in ("'", '"')
+            ):
+                api_key = api_key[1:-1]
 
             if api_key is None:
                 raise ValueError(
@@ -243,21 +756,38 @@ class BaseDatalabClient(metaclass=AutoPrettyPrint):
 
             self._api_key = api_key
 
-            # Reset session as we are now updating the headers
-            if self._session is not None:
-                try:
-                    self._session.close()
-                except Exception:
-                    pass
-                finally:
-                    self._session = None
+            # Update the headers of any existing session in place, rather than closing it,
+            # so that the connection warmed up by the initial `/info` request is reused
             self._headers["DATALAB-API-KEY"] = self.api_key
+            if self._session is not None:
+                self._session.headers["DATALAB-API-KEY"] = self.api_key
 
         return self.api_key
 
     def __enter__(self) -> "BaseDatalabClient":
         return self
 
-    def __exit__(self, *_):
+    def close(self) -> None:
+        """Close the underlying HTTP session and its connections; a new session will be
+        opened if the client is used again.
+
+        """
         if self._session is not None:
             self._session.close()
+            self._session = None
+
+    def __exit__(self, *_):
+        self.close()
+
+    async def __aenter__(self) -> "BaseDatalabClient":
+        if self._async_client is None:
+            self._async_client = self._new_async_session()
+            self._async_client_loop = asyncio.get_running_loop()
+        return self
+
+    async def __aexit__(self, *_):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
+        self.close()
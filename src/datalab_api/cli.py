@@ -1,54 +1,93 @@
+import functools
+import os
 import time
-from typing import Annotated, Optional
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Annotated, Iterator, Optional
 
 import typer
-from click_shell import make_click_shell
-from rich.console import Console
-from rich.live import Live
-from rich.panel import Panel
-from rich.pretty import pprint
-from rich.table import Table
 
 from datalab_api import DatalabClient
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
 app = typer.Typer(
     name="datalab",
     help="A command-line interface for the Datalab API.",
     epilog="Copyright (c) 2020-2024 Matthew Evans, Joshua Bocarsly & the Datalab Development Team.",
 )
 
-console = Console()
+
+@dataclass
+class CLIState:
+    """State shared between the commands of a CLI session, stored in `ctx.obj`."""
+
+    client: Optional[DatalabClient] = None
+    instance_url: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=1)
+def _console() -> "Console":
+    """The rich console used for all CLI output, created on first use."""
+    from rich.console import Console
+
+    return Console()
 
 
 @app.callback(invoke_without_command=True)
 def launch(
     ctx: typer.Context,
     instance_url: Annotated[Optional[str], typer.Argument()] = None,
-    animate_intro: bool = True,
+    animate_intro: Annotated[
+        bool,
+        typer.Option(
+            envvar="DATALAB_ANIMATE_INTRO",
+            help="Animate the intro logo; never animated outside an interactive terminal or in CI.",
+        ),
+    ] = True,
 ):
     """Makes an interactive REPL-style interface using the subcommands below."""
+    from click_shell import make_click_shell
+    from rich.live import Live
+    from rich.panel import Panel
+
+    # Child contexts of the shell's subcommands inherit `ctx.obj`, so the client is shared between them
+    ctx.obj = CLIState()
+    console = _console()
+
+    # Don't hold up non-interactive sessions (e.g., piped output or CI) with the animation
+    if animate_intro and (not console.is_terminal or os.environ.get("CI")):
+        animate_intro = False
+
     shell = make_click_shell(
         ctx,
         prompt="datalab > ",
     )
 
-    animation_intro = _make_fancy_intro()
+    epilog = app.info.epilog
+    panel_width = len(epilog) + 6
+
+    frames = _make_fancy_intro(animate=animate_intro)
     if animate_intro:
-        with Live(console=console, auto_refresh=False) as live:
-            for frame in animation_intro:
-                live._live_render.set_renderable(
+        # transient, so that the last frame is replaced by the final panel printed below
+        with Live(console=console, auto_refresh=False, transient=True) as live:
+            for frame in frames:
+                live.update(
                     Panel(
                         frame,
-                        subtitle=app.info.epilog,
-                        width=len(app.info.epilog) + 6,
+                        subtitle=epilog,
+                        width=panel_width,
                         highlight=False,
-                    )
-                )  # type: ignore
-                console.print(live._live_render.position_cursor())
+                    ),
+                    refresh=True,
+                )
+                # pace the animation, as frames are generated far faster than they should be shown
                 time.sleep(0.05)
+    else:
+        frame = next(frames)
 
     console.print(
-        Panel(animation_intro[-1], subtitle=app.info.epilog, width=len(app.info.epilog) + 6),
+        Panel(frame, subtitle=epilog, width=panel_width),
         highlight=False,
     )  # type: ignore
     console.print()
@@ -56,7 +95,7 @@ def launch(
         Panel(
             "This CLI is an experimental work in progress and does not expose the full functionality of the underlying DatalabClient.",
             title="[red]WARNING![/red]",
-            width=len(app.info.epilog) + 6,
+            width=panel_width,
         )
     )
     console.print()
@@ -70,19 +109,18 @@ def _get_client(
     ctx: typer.Context,
     instance_url: Optional[str] = None,
     log_level: str = "WARNING",
-):
-    client = getattr(ctx, "client", None)
+) -> DatalabClient:
+    state = ctx.ensure_object(CLIState)
     if instance_url is None:
-        instance_url = getattr(ctx, "instance_url", None)  # type: ignore
-    if client is None:
-        client = DatalabClient(datalab_api_url=instance_url, log_level=log_level)  # type: ignore
-    ctx.client = client
-    ctx.instance_url = client.datalab_api_url
-    return ctx.client
+        instance_url = state.instance_url
+    if state.client is None:
+        state.client = DatalabClient(datalab_api_url=instance_url, log_level=log_level)  # type: ignore
+    state.instance_url = state.client.datalab_api_url
+    return state.client
 
 
 def _get_instance_url(ctx: typer.Context):
-    instance_url = getattr(ctx, "instance_url", None)
+    instance_url = ctx.ensure_object(CLIState).instance_url
     if instance_url is None:
         raise ValueError("No Datalab API URL provided.")
     return instance_url
@@ -96,7 +134,7 @@ def authenticate(
 ):
     client = _get_client(ctx, instance_url, log_level)
     user = client.authenticate()
-    console.print(
+    _console().print(
         f"Welcome [red]{user['display_name']}[/red]!\nSuccessfully authenticated at [blue]{client.datalab_api_url}[/blue]."
     )
 
@@ -110,6 +148,8 @@ def get(
     log_level: str = "WARNING",
 ):
     """Get a table of items of the given type."""
+    from rich.table import Table
+
     client = _get_client(ctx, instance_url, log_level)
     items = client.get_items(item_type)
     table = Table(title=f"/{item_type}/", show_lines=True)
@@ -131,18 +171,29 @@ def get(
             ", ".join(d["display_name"] for d in item["creators"]),
             end_section=True,
         )
-    console.print(table)
+    _console().print(table)
 
 
 @app.command()
 def info(ctx: typer.Context, instance_url: str, log_level: str = "WARNING"):
     """Print the server info."""
+    from rich.pretty import pprint
+
     client = _get_client(ctx, instance_url, log_level)
     pprint(client.get_info())
 
 
-def _make_fancy_intro(animate=True):
-    """Bit of fun, make an animated datalab logo intro to the CLI."""
+def _make_fancy_intro(animate: bool = True) -> Iterator[str]:
+    """Bit of fun, make an animated datalab logo intro to the CLI.
+
+    Parameters:
+        animate: Whether to generate all frames of the animation, or just the final frame.
+
+    Yields:
+        The frames of the animation, as rich markup strings, generated as they are
+        needed.
+
+    """
     import random
 
     intro_ascii = """
@@ -165,30 +216,49 @@ def _make_fancy_intro(animate=True):
     colours.append("black")
     num_colours = len(colours)
 
-    animation: list[str] = []
-    colours_by_index: list[int] = [num_colours - 1] * len(intro_ascii)
     beta_1: float = 0.2
     beta_2: float = 0.6
     steps: int = 0
     max_steps: int = 50
 
-    while max(colours_by_index) != 0:
-        intro_fancy = ""
-        for ind, char in enumerate(intro_ascii):
-            if char == " ":
-                colours_by_index[ind] = 0
-                intro_fancy += " "
-            else:
-                if colours_by_index[ind] != 0 and random.random() < (steps / max_steps) * beta_1:
-                    colours_by_index[ind] = 0
-                elif colours_by_index[ind] != 0 and random.random() < (steps / max_steps) * beta_2:
-                    colours_by_index[ind] = random.randint(1, num_colours - 2)
-                intro_fancy += f"[{colours[colours_by_index[ind]]}]{char}[/]"
-
-        animation.append(intro_fancy)
-        steps += 1
+    # Markup for each character in each colour, built once rather than per frame
+    tokens: list[Optional[list[str]]] = [
+        None if char == " " else [f"[{colour}]{char}[/]" for colour in colours]
+        for char in intro_ascii
+    ]
+
+    if not animate:
+        # Only the final frame is shown, in which every character has settled on the first colour
+        yield "".join(" " if char_tokens is None else char_tokens[0] for char_tokens in tokens)
+        return
+
+    colours_by_index: list[int] = [
+        0 if char_tokens is None else num_colours - 1 for char_tokens in tokens
+    ]
+    # Count the characters still to settle, rather than recomputing `max` each frame
+    remaining: int = sum(char_tokens is not None for char_tokens in tokens)
+
+    while remaining:
+        # The chance of each character changing colour grows as the animation progresses
+        settle_threshold = (steps / max_steps) * beta_1
+        change_threshold = (steps / max_steps) * beta_2
+        frame: list[str] = []
+        for ind, char_tokens in enumerate(tokens):
+            if char_tokens is None:
+                frame.append(" ")
+                continue
+            colour = colours_by_index[ind]
+            if colour != 0:
+                if random.random() < settle_threshold:
+                    colour = 0
+                    remaining -= 1
+                elif random.random() < change_threshold:
+                    colour = random.randint(1, num_colours - 2)
+                colours_by_index[ind] = colour
+            frame.append(char_tokens[colour])
 
-    return animation
+        yield "".join(frame)
+        steps += 1
 
 
 if __name__ == "__main__":
@@ -1,10 +1,17 @@
+import http.server
 import json
 import os
+import threading
+import urllib.parse
+from typing import Optional
 
+import respx
+from datalab_api import DatalabClient
+from httpx import Response
 from pytest import fixture
 
 
-@fixture
+@fixture(scope="session")
 def fake_ui_html():
     """Returns a mocked HTML response from the Datalab UI that includes a metadata tag for a fake API URL."""
     return """<!doctype html>
@@ -39,7 +46,7 @@ def fake_ui_html():
 </html>"""
 
 
-@fixture
+@fixture(scope="session")
 def fake_info_json():
     """Returns a mocked JSON response for the API /info endpoint."""
 
@@ -49,25 +56,131 @@ def fake_info_json():
 
 
 @fixture(scope="session")
-def fake_api_key():
-    """Returns a fake API key."""
-    return 24 * "0"
+def fake_api_url():
+    """Returns the URL of the fake datalab API."""
+    return "https://api.datalab.industries"
+
+
+@fixture
+def fake_item_json():
+    """Returns a mocked JSON response for the API /get-item-data endpoint."""
+    return {
+        "status": "success",
+        "item_data": {
+            "item_id": "test",
+            "type": "samples",
+            "blocks_obj": {},
+            "display_order": [],
+            "file_ObjectIds": ["1", "2"],
+            "files": [
+                {"name": "one.txt", "location": "/app/files/1/one.txt"},
+                {"name": "two.txt", "location": "/app/files/2/two.txt"},
+            ],
+        },
+    }
+
 
+@fixture
+def mocked_api(fake_api_url, fake_info_json):
+    """Mocks the endpoints required to construct a client for the fake datalab API."""
+    with respx.mock(base_url=fake_api_url, assert_all_called=False) as respx_mock:
+        respx_mock.get("/", name="api").mock(
+            return_value=Response(200, content="<!doctype html></html>")
+        )
+        respx_mock.get("/info", name="info").mock(return_value=Response(200, json=fake_info_json))
+        yield respx_mock
 
-@fixture(scope="session", autouse=True)
-def set_fake_api_key(fake_api_key):
-    """Sets a fake API key in the env, expecting a datalab instance with identifier prefix 'test'.
 
-    Will reset the old env var if present on clean exit.
+class FakeProxy(http.server.ThreadingHTTPServer):
+    """A local HTTP server that answers both proxied and direct requests for the fake
+    datalab API, recording the target of each request: an absolute URL (or `host:port`
+    for `CONNECT`) when it is used as a proxy, or just the path when requested directly.
 
     """
-    old_value = os.environ.get("TEST_DATALAB_API_KEY")
-    try:
-        os.environ["TEST_DATALAB_API_KEY"] = fake_api_key
-        yield
 
+    daemon_threads = True
+
+    def __init__(self, responses: dict[str, bytes]):
+        super().__init__(("127.0.0.1", 0), _FakeProxyHandler)
+        self.responses = responses
+        self.requests: list[str] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _FakeProxyHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeProxy
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        body = self.server.responses.get(urllib.parse.urlsplit(self.path).path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_CONNECT(self):
+        # tunnelling is not supported, but the attempt shows that the proxy was used
+        self.server.requests.append(self.path)
+        self.send_error(502)
+
+    def log_message(self, *args):
+        pass
+
+
+@fixture
+def fake_proxy(fake_info_json):
+    """Runs a `FakeProxy` that serves the endpoints required to construct a client."""
+    proxy = FakeProxy(
+        {
+            "/": b"<!doctype html></html>",
+            "/info": json.dumps(fake_info_json).encode(),
+            "/samples": json.dumps({"status": "success", "samples": []}).encode(),
+        }
+    )
+    thread = threading.Thread(target=proxy.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        yield proxy
     finally:
-        if old_value:
-            os.environ["TEST_DATALAB_API_KEY"] = old_value
-        else:
-            del os.environ["TEST_DATALAB_API_KEY"]
+        proxy.shutdown()
+        proxy.server_close()
+
+
+FAKE_API_KEY = 24 * "0"
+_OLD_API_KEY: Optional[str] = None
+
+
+def pytest_configure(config):
+    """Sets a fake API key in the env, expecting a datalab instance with identifier prefix 'test'."""
+    global _OLD_API_KEY
+    _OLD_API_KEY = os.environ.get("TEST_DATALAB_API_KEY")
+    os.environ["TEST_DATALAB_API_KEY"] = FAKE_API_KEY
+
+
+def pytest_unconfigure(config):
+    """Resets the API key env var to its value (or absence) before the test session."""
+    if _OLD_API_KEY is None:
+        os.environ.pop("TEST_DATALAB_API_KEY", None)
+    else:
+        os.environ["TEST_DATALAB_API_KEY"] = _OLD_API_KEY
+
+
+@fixture(scope="session")
+def fake_api_key():
+    """Returns the fake API key set in the env for the test session."""
+    return FAKE_API_KEY
+
+
+@fixture(autouse=True)
+def clear_info_cache():
+    """Clears the `/info` responses cached between clients, so that each test starts afresh."""
+    DatalabClient.clear_info_cache()
+    yield
+    DatalabClient.clear_info_cache()
@@ -1,6 +1,13 @@
+import asyncio
+import json
+import logging
+import math
+from unittest import mock
+
+import httpx
 import pytest
 import respx
-from datalab_api import DatalabClient
+from datalab_api import DatalabClient, DuplicateItemError
 from httpx import Response
 
 
@@ -20,3 +27,551 @@ def test_redirect_url(fake_ui_html, fake_info_json):
     assert fake_ui.called
     assert fake_api.called
     assert client.datalab_api_url == "https://api.datalab.industries"
+
+
+def test_get_item_files(mocked_api, fake_api_url, fake_item_json, tmp_path, monkeypatch):
+    mocked_api.get("/get-item-data/test").mock(return_value=Response(200, json=fake_item_json))
+    one = mocked_api.get("/files/1/one.txt").mock(return_value=Response(200, content=b"one"))
+    two = mocked_api.get("/files/2/two.txt").mock(return_value=Response(200, content=b"two"))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "two.txt").write_bytes(b"existing")
+
+    with DatalabClient(fake_api_url) as client:
+        with pytest.warns(UserWarning, match="Will not overwrite existing file two.txt"):
+            client.get_item_files("test")
+
+    assert one.called
+    assert not two.called
+    assert (tmp_path / "one.txt").read_bytes() == b"one"
+    assert (tmp_path / "two.txt").read_bytes() == b"existing"
+
+
+def test_get_item_files_failed_download(
+    mocked_api, fake_api_url, fake_item_json, tmp_path, monkeypatch
+):
+    mocked_api.get("/get-item-data/test").mock(return_value=Response(200, json=fake_item_json))
+    mocked_api.get("/files/1/one.txt").mock(side_effect=httpx.ReadError("connection lost"))
+    mocked_api.get("/files/2/two.txt").mock(return_value=Response(200, content=b"two"))
+    monkeypatch.chdir(tmp_path)
+
+    with DatalabClient(fake_api_url) as client:
+        with pytest.raises(httpx.ReadError):
+            client.get_item_files("test")
+
+    # a partial download is removed, so that it does not block a retry
+    assert not (tmp_path / "one.txt").exists()
+
+
+def test_aget_items(mocked_api, fake_api_url):
+    samples = [{"item_id": "sample", "type": "samples"}]
+    cells = [{"item_id": "cell", "type": "cells"}]
+    mocked_api.get("/samples").mock(
+        return_value=Response(200, json={"status": "success", "samples": samples})
+    )
+    mocked_api.get("/cells").mock(
+        return_value=Response(200, json={"status": "success", "cells": cells})
+    )
+
+    async def list_items(client):
+        return await asyncio.gather(client.aget_items("samples"), client.aget_items("cells"))
+
+    with DatalabClient(fake_api_url) as client:
+        assert client.get_items() == samples
+        assert asyncio.run(list_items(client)) == [samples, cells]
+
+
+def test_get_item_load_blocks(mocked_api, fake_api_url, fake_item_json):
+    fake_item_json["item_data"]["blocks_obj"] = {
+        "a": {"block_id": "a", "blocktype": "comment"},
+        "b": {"block_id": "b", "blocktype": "comment"},
+        "deleted": {"block_id": "deleted", "blocktype": "comment"},
+    }
+    fake_item_json["item_data"]["display_order"] = ["b", "a"]
+    mocked_api.get("/get-item-data/test").mock(return_value=Response(200, json=fake_item_json))
+
+    def update_block(request):
+        block_data = json.loads(request.content)["block_data"]
+        return Response(
+            200, json={"status": "success", "new_block_data": {**block_data, "loaded": True}}
+        )
+
+    update = mocked_api.post("/update-block/").mock(side_effect=update_block)
+
+    with DatalabClient(fake_api_url) as client:
+        # blocks are loaded over the pooled sync session, without creating an async client
+        with mock.patch.object(client, "_new_async_session", side_effect=AssertionError):
+            item = client.get_item("test", load_blocks=True)
+
+    assert update.call_count == 2
+    assert list(item["blocks_obj"]) == ["a", "b"]
+    assert all(block["loaded"] for block in item["blocks_obj"].values())
+    assert item["blocks_obj"]["a"]["block_id"] == "a"
+
+
+def test_search_items_encodes_query(mocked_api, fake_api_url):
+    items = [{"item_id": "test", "type": "samples"}]
+    search = mocked_api.get(
+        "/search-items", params={"query": "Na & K #2", "types": "samples,cells"}
+    )
+    search.mock(return_value=Response(200, json={"status": "success", "items": items}))
+
+    with DatalabClient(fake_api_url) as client:
+        assert client.search_items("Na & K #2") == items
+
+    assert search.called
+
+
+def test_non_finite_json(mocked_api, fake_api_url, fake_item_json):
+    fake_item_json["item_data"]["mass"] = float("nan")
+    mocked_api.get("/get-item-data/test").mock(
+        return_value=Response(
+            200, content=json.dumps(fake_item_json), headers={"Content-Type": "application/json"}
+        )
+    )
+    save = mocked_api.post("/save-item/").mock(
+        return_value=Response(200, json={"status": "success"})
+    )
+
+    with DatalabClient(fake_api_url) as client:
+        item = client.get_item("test")
+        assert math.isnan(item["mass"])
+        client.update_item("test", {"mass": float("inf"), "count": 2**70})
+
+    # NaN/Infinity and big integers are sent as the stdlib `json` module would send them
+    assert json.loads(save.calls.last.request.content)["data"] == {
+        "mass": float("inf"),
+        "count": 2**70,
+    }
+    assert b"Infinity" in save.calls.last.request.content
+
+
+def test_get_info_is_cached(mocked_api, fake_api_url, fake_info_json):
+    with DatalabClient(fake_api_url) as client:
+        assert client.get_info() == fake_info_json
+        # mutating a result does not affect the cached response shared between clients
+        client.get_info()["data"]["attributes"]["server_version"] = "mutated"
+        assert client.get_info() == fake_info_json
+        assert mocked_api["info"].call_count == 1
+        client.get_info(force_refresh=True)
+        assert mocked_api["info"].call_count == 2
+
+    with DatalabClient(fake_api_url) as client:
+        assert client.get_info() == fake_info_json
+    assert mocked_api["info"].call_count == 2
+
+
+def test_create_data_block_reuses_attached_files(mocked_api, fake_api_url, fake_item_json):
+    get_item = mocked_api.get("/get-item-data/test").mock(
+        return_value=Response(200, json=fake_item_json)
+    )
+    mocked_api.post("/add-data-block/").mock(
+        return_value=Response(200, json={"status": "success", "new_block_obj": {"block_id": "a"}})
+    )
+    mocked_api.post("/update-block/").mock(
+        return_value=Response(
+            200, json={"status": "success", "new_block_data": {"block_id": "a", "file_id": "1"}}
+        )
+    )
+
+    with DatalabClient(fake_api_url) as client:
+        client.create_data_block("test", "tabular", file_ids="1")
+        client.create_data_block("test", "tabular", file_ids="2")
+        assert get_item.call_count == 1
+        with pytest.raises(RuntimeError, match="Not all IDs"):
+            client.create_data_block("test", "tabular", file_ids="3")
+        # an unknown file is checked against a fresh copy of the item before raising
+        assert get_item.call_count == 2
+
+        # a file attached elsewhere (e.g., in the UI) is found by re-fetching the item
+        fake_item_json["item_data"]["file_ObjectIds"].append("3")
+        get_item.mock(return_value=Response(200, json=fake_item_json))
+        client.create_data_block("test", "tabular", file_ids="3")
+        assert get_item.call_count == 3
+
+
+def test_item_files_cache_is_bounded(mocked_api, fake_api_url, fake_item_json, monkeypatch):
+    for item_id in ("a", "b", "c"):
+        mocked_api.get(f"/get-item-data/{item_id}").mock(
+            return_value=Response(
+                200,
+                json={
+                    **fake_item_json,
+                    "item_data": {**fake_item_json["item_data"], "item_id": item_id},
+                },
+            )
+        )
+    monkeypatch.setattr(DatalabClient, "item_files_cache_size", 2)
+
+    with DatalabClient(fake_api_url) as client:
+        client.bulk_get_items(["a", "b", "c"])
+        assert len(client._item_files_cache) == 2
+
+
+def test_session_is_reused(mocked_api, fake_api_url):
+    with DatalabClient(fake_api_url) as client:
+        assert client.session is client.session
+        assert "DATALAB-API-KEY" in client.session.headers
+
+
+def test_environment_proxies_are_used(fake_proxy, monkeypatch):
+    for var in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY"):
+        monkeypatch.delenv(var, raising=False)
+        monkeypatch.delenv(var.lower(), raising=False)
+    monkeypatch.setenv("HTTP_PROXY", fake_proxy.url)
+    monkeypatch.setenv("HTTPS_PROXY", fake_proxy.url)
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    api_url = "http://api.datalab.industries"
+
+    with DatalabClient(api_url) as client:
+        assert client.get_items() == []
+        assert asyncio.run(client.aget_items()) == []
+        # HTTPS requests are tunnelled through the proxy
+        with pytest.raises(httpx.ProxyError):
+            client.session.get("https://api.datalab.industries/info")
+        # but hosts in NO_PROXY are requested directly
+        assert client.session.get(f"{fake_proxy.url}/info").status_code == 200
+
+    assert fake_proxy.requests == [
+        f"{api_url}/",
+        f"{api_url}/info",
+        f"{api_url}/samples",
+        f"{api_url}/samples",
+        "api.datalab.industries:443",
+        "/info",
+    ]
+
+
+def test_log_level_is_only_set_explicitly(mocked_api, fake_api_url):
+    logger = logging.getLogger("datalab_api")
+    old_level = logger.level
+    try:
+        DatalabClient(fake_api_url, log_level="ERROR")
+        DatalabClient(fake_api_url)
+        assert logger.level == logging.ERROR
+    finally:
+        logger.setLevel(old_level)
+
+
+def test_headers_are_per_client(mocked_api, fake_api_url, monkeypatch):
+    first = DatalabClient(fake_api_url)
+    monkeypatch.setenv("TEST_DATALAB_API_KEY", "another-key")
+    second = DatalabClient(fake_api_url)
+
+    assert second.headers["DATALAB-API-KEY"] == "another-key"
+    assert first.headers["DATALAB-API-KEY"] != "another-key"
+
+
+@pytest.mark.parametrize(
+    "env_value, api_key",
+    [("'key'", "key"), ('"key"', "key"), ("\"key'", "\"key'"), ("key", "key")],
+)
+def test_api_key_quotes(mocked_api, fake_api_url, monkeypatch, env_value, api_key):
+    monkeypatch.setenv("TEST_DATALAB_API_KEY", env_value)
+    assert DatalabClient(fake_api_url).api_key == api_key
+
+
+def test_info_cache_persisted(mocked_api, fake_api_url, fake_info_json, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    with DatalabClient(fake_api_url, cache=True):
+        pass
+    DatalabClient.clear_info_cache()
+    with DatalabClient(fake_api_url, cache=True) as client:
+        assert client.get_info() == fake_info_json
+
+    assert mocked_api["info"].call_count == 1
+    assert len(list((tmp_path / "datalab-api").glob("*.json"))) == 1
+
+
+def test_upload_file(mocked_api, fake_api_url, tmp_path):
+    upload = mocked_api.post("/upload-file/").mock(
+        return_value=Response(201, json={"status": "success", "file_id": "1"})
+    )
+    file_path = tmp_path / "data.csv"
+    file_path.write_text("a,b\n1,2\n")
+
+    with DatalabClient(fake_api_url) as client:
+        assert client.upload_file("test", file_path)["file_id"] == "1"
+        assert b'filename="data.csv"' in upload.calls.last.request.content
+        with pytest.raises(FileNotFoundError, match="does not exist"):
+            client.upload_file("test", tmp_path / "missing.csv")
+
+
+def test_create_item(mocked_api, fake_api_url):
+    new_sample = mocked_api.post("/new-sample/").mock(
+        side_effect=lambda request: Response(
+            201, json={"status": "success", "sample_list_entry": json.loads(request.content)}
+        )
+    )
+    item_data = {"name": "test"}
+
+    with DatalabClient(fake_api_url) as client:
+        item = client.create_item("test", "samples", item_data)
+
+    assert item == {"name": "test", "item_id": "test", "type": "samples"}
+    assert item_data == {"name": "test"}
+    assert new_sample.called
+
+
+def test_bulk_create_items(mocked_api, fake_api_url, monkeypatch):
+    monkeypatch.setattr(DatalabClient, "bulk_create_batch_size", 4)
+
+    def new_samples(request):
+        new_sample_datas = json.loads(request.content)["new_sample_datas"]
+        responses, http_codes = [], []
+        for item in new_sample_datas:
+            if item["item_id"] == "duplicate":
+                responses.append({"status": "error"})
+                http_codes.append(409)
+            else:
+                responses.append({"status": "success", "sample_list_entry": item})
+                http_codes.append(201)
+        return Response(207, json={"responses": responses, "http_codes": http_codes})
+
+    bulk = mocked_api.post("/new-samples/").mock(side_effect=new_samples)
+    single = mocked_api.post("/new-sample/")
+    items = [{"item_id": f"test_{i}", "type": "samples"} for i in range(5)]
+    items.insert(2, {"item_id": "duplicate", "type": "samples"})
+
+    with DatalabClient(fake_api_url) as client:
+        results = client.bulk_create_items(items)
+
+    assert bulk.call_count == 2
+    assert not single.called
+    assert isinstance(results.pop(2), DuplicateItemError)
+    assert [result["item_id"] for result in results] == [f"test_{i}" for i in range(5)]
+
+
+@pytest.mark.parametrize("failure", ["error", "short"])
+def test_bulk_create_items_failed_batch(mocked_api, fake_api_url, monkeypatch, failure):
+    monkeypatch.setattr(DatalabClient, "bulk_create_batch_size", 2)
+
+    def new_samples(request):
+        new_sample_datas = json.loads(request.content)["new_sample_datas"]
+        if new_sample_datas[0]["item_id"] != "test_0":
+            if failure == "error":
+                return Response(500, text="Internal Server Error")
+            new_sample_datas = new_sample_datas[:1]
+        return Response(
+            207,
+            json={
+                "responses": [
+                    {"status": "success", "sample_list_entry": item} for item in new_sample_datas
+                ],
+                "http_codes": [201] * len(new_sample_datas),
+            },
+        )
+
+    mocked_api.post("/new-samples/").mock(side_effect=new_samples)
+    single = mocked_api.post("/new-sample/")
+    items = [{"item_id": f"test_{i}", "type": "samples"} for i in range(4)]
+
+    with DatalabClient(fake_api_url) as client:
+        results = client.bulk_create_items(items)
+
+    # the items of the failed batch are not re-created one-by-one
+    assert not single.called
+    assert [result["item_id"] for result in results[:2]] == ["test_0", "test_1"]
+    assert all(isinstance(result, RuntimeError) for result in results[2:])
+    assert len(results) == 4
+
+
+def test_bulk_create_items_fallback(mocked_api, fake_api_url):
+    def new_sample(request):
+        item = json.loads(request.content)
+        if item["item_id"] == "duplicate":
+            return Response(409, json={"status": "error"})
+        return Response(201, json={"status": "success", "sample_list_entry": item})
+
+    bulk = mocked_api.post("/new-samples/").mock(return_value=Response(404))
+    mocked_api.post("/new-sample/").mock(side_effect=new_sample)
+    items = [{"item_id": f"test_{i}", "type": "samples"} for i in range(5)]
+    items.insert(2, {"item_id": "duplicate", "type": "samples"})
+
+    with DatalabClient(fake_api_url) as client:
+        results = client.bulk_create_items(items)
+        client.bulk_create_items(items[:1])
+
+    assert bulk.call_count == 1
+    assert isinstance(results.pop(2), DuplicateItemError)
+    assert [result["item_id"] for result in results] == [f"test_{i}" for i in range(5)]
+
+
+def test_bulk_update_items(mocked_api, fake_api_url):
+    mocked_api.post("/save-item/").mock(return_value=Response(200, json={"status": "success"}))
+
+    with DatalabClient(fake_api_url) as client:
+        results = client.bulk_update_items({"a": {"name": "A"}, "b": {"name": "B"}})
+
+    assert results == {"a": {"status": "success"}, "b": {"status": "success"}}
+
+
+@pytest.mark.parametrize("method", ["bulk_create_items", "bulk_update_items"])
+def test_bulk_requests_propagate_cancellation(mocked_api, fake_api_url, method):
+    def cancel(request):
+        raise asyncio.CancelledError
+
+    mocked_api.post("/new-samples/").mock(return_value=Response(404))
+    mocked_api.post("/new-sample/").mock(side_effect=cancel)
+    mocked_api.post("/save-item/").mock(side_effect=cancel)
+    items = [{"item_id": "a", "type": "samples"}, {"item_id": "b", "type": "samples"}]
+
+    with DatalabClient(fake_api_url) as client:
+        with pytest.raises(asyncio.CancelledError):
+            if method == "bulk_create_items":
+                client.bulk_create_items(items)
+            else:
+                client.bulk_update_items({item["item_id"]: item for item in items})
+
+
+def test_bulk_get_items(mocked_api, fake_api_url, fake_item_json):
+    mocked_api.get("/get-item-data/test").mock(return_value=Response(200, json=fake_item_json))
+    mocked_api.get("/get-item-data/missing").mock(
+        return_value=Response(404, json={"status": "error"})
+    )
+
+    with DatalabClient(fake_api_url) as client:
+        results = client.bulk_get_items(["test", "missing"])
+
+    assert results["test"]["item_id"] == "test"
+    assert isinstance(results["missing"], Exception)
+
+
+def test_transient_errors_are_retried(mocked_api, fake_api_url, monkeypatch):
+    monkeypatch.setattr(DatalabClient, "retry_backoff", 0.0)
+    samples = mocked_api.get("/samples").mock(
+        side_effect=[
+            Response(503),
+            Response(502),
+            Response(200, json={"status": "success", "samples": []}),
+        ]
+    )
+    update = mocked_api.post("/save-item/").mock(return_value=Response(503))
+
+    with DatalabClient(fake_api_url) as client:
+        assert client.get_items() == []
+        assert samples.call_count == 3
+        with pytest.raises(RuntimeError, match="Failed to update item"):
+            client.update_item("test", {})
+        assert update.call_count == 1
+
+    samples.reset()
+    samples.side_effect = [Response(503), Response(200, json={"status": "success", "samples": []})]
+    with DatalabClient(fake_api_url, max_retries=0) as client:
+        with pytest.raises(RuntimeError):
+            client.get_items()
+        assert samples.call_count == 1
+
+
+def test_connection_errors_are_retried_once_per_attempt(mocked_api, fake_api_url, monkeypatch):
+    monkeypatch.setattr(DatalabClient, "retry_backoff", 0.0)
+    update = mocked_api.post("/save-item/").mock(
+        side_effect=[
+            httpx.ConnectError("connection refused"),
+            Response(200, json={"status": "success"}),
+        ]
+    )
+    samples = mocked_api.get("/samples").mock(side_effect=httpx.ConnectError("connection refused"))
+    cells = mocked_api.get("/cells").mock(side_effect=httpx.ReadTimeout("timed out"))
+
+    with DatalabClient(fake_api_url) as client:
+        # a request that never reached the server is retried whatever its method
+        assert client.update_item("test", {}) == {"status": "success"}
+        assert update.call_count == 2
+        # each retry makes a single connection attempt
+        with pytest.raises(httpx.ConnectError):
+            client.get_items()
+        assert samples.call_count == client.max_retries + 1
+        # but a hung server is not waited out once per retry
+        with pytest.raises(httpx.ReadTimeout):
+            client.get_items("cells")
+        assert cells.call_count == 1
+
+
+def test_aget_item(mocked_api, fake_api_url, fake_item_json):
+    mocked_api.get("/get-item-data/test").mock(return_value=Response(200, json=fake_item_json))
+    mocked_api.post("/update-block/").mock(
+        return_value=Response(200, json={"status": "success", "new_block_data": {"loaded": True}})
+    )
+
+    with DatalabClient(fake_api_url) as client:
+        item = asyncio.run(client.aget_item("test"))
+        block = asyncio.run(client.aget_block("test", "a", {"block_id": "a"}))
+        with pytest.raises(ValueError, match="Must provide one of"):
+            asyncio.run(client.aget_item())
+
+    assert item["item_id"] == "test"
+    assert block == {"loaded": True}
+
+
+def test_async_context_manager(mocked_api, fake_api_url, fake_item_json):
+    mocked_api.get("/get-item-data/test").mock(return_value=Response(200, json=fake_item_json))
+
+    async def use_client():
+        async with DatalabClient(fake_api_url) as client:
+            async with client._async_session() as first, client._async_session() as second:
+                assert first is second
+            assert (await client.aget_item("test"))["item_id"] == "test"
+            # sync methods run on another event loop, so must not reuse the async session
+            assert client.get_item("test")["item_id"] == "test"
+        assert client._async_client is None
+
+    asyncio.run(use_client())
+
+
+def test_version_negotiation(mocked_api, fake_api_url):
+    with DatalabClient(fake_api_url) as client:
+        client._datalab_api_versions = ["0.10.0", "0.1.2", "0.1.10", "1.1.0"]
+        client._version_negotiation()
+        assert client._selected_api_version == "0.1.10"
+
+        client._datalab_server_version = "0.2.0"
+        with pytest.raises(RuntimeError, match="Server version 0.2.0 is not supported"):
+            client._version_negotiation()
+
+        client._datalab_api_versions = ["0.10.0"]
+        with pytest.raises(RuntimeError, match="No supported API versions"):
+            client._version_negotiation()
+
+
+def test_display(mocked_api, fake_api_url, capsys):
+    items = [{"item_id": "test", "type": "samples", "refcode": "test:ABCDEF", "name": "Test"}]
+    mocked_api.get("/samples").mock(
+        return_value=Response(200, json={"status": "success", "samples": items})
+    )
+
+    with DatalabClient(fake_api_url) as client:
+        assert client.get_items(display=True, page_limit=1) == items
+        assert client.get_info(display=True)
+
+    assert "test:ABCDEF" in capsys.readouterr().out
+
+
+def test_display_bulk_errors(mocked_api, fake_api_url, capsys):
+    def new_samples(request):
+        return Response(
+            207,
+            json={
+                "responses": [
+                    {
+                        "status": "success",
+                        "sample_list_entry": {"refcode": "test:ABCDEF", "name": "Test", **item},
+                    }
+                    if item["item_id"] == "test"
+                    else {"status": "error"}
+                    for item in json.loads(request.content)["new_sample_datas"]
+                ],
+                "http_codes": [201, 409],
+            },
+        )
+
+    mocked_api.post("/new-samples/").mock(side_effect=new_samples)
+    items = [{"item_id": "test", "type": "samples"}, {"item_id": "duplicate", "type": "samples"}]
+
+    with DatalabClient(fake_api_url) as client:
+        results = client.bulk_create_items(items, display=True)
+
+    assert isinstance(results[1], DuplicateItemError)
+    out = capsys.readouterr().out
+    assert "test:ABCDEF" in out
+    assert "DuplicateItemError" in out